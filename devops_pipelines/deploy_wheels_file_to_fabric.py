@@ -11,48 +11,124 @@ Typical usage involves setting required environment variables for authentication
 Functions:
     _get_fabric_api_token(client_id: str, client_secret: str, tenant_id: str) -> str
 
-    _fabric_api_request(request_type: str, token: str, request_url: str, files: dict | None = None, headers: dict | None = None, max_retries: int = 3) -> str
+    _get_retry_delay(attempt: int, response: requests.Response | None = None, base_delay: float = 1.0, max_delay: float = 30.0, jitter: float = 0.5) -> float
 
-    _get_fabric_environment_state(token: str, workspace_id: str, environment_id: str) -> str
+    _get_fabric_environment_url(workspace_id: str, environment_id: str) -> str
+
+    _sleep_before_retry(delay: float, request_url: str, deadline: float | None = None) -> None
+
+    _fabric_api_request(request_type: str, token: str, request_url: str, files: dict | None = None, headers: dict | None = None, params: dict | None = None, max_retries: int = 3, return_headers: bool = False, deadline: float | None = None, etag: str | None = None) -> dict | tuple[dict | None, CaseInsensitiveDict] | None
+
+    _get_fabric_environment_state(token: str, workspace_id: str, environment_id: str, deadline: float | None = None, etag: str | None = None, cached_state: str | None = None) -> tuple[str, str | None]
 
     _get_fabric_environment_custom_libraries(token: str, workspace_id: str, environment_id: str) -> dict
 
+    _get_fabric_environment_published_custom_libraries(token: str, workspace_id: str, environment_id: str) -> dict
+
     _delete_fabric_environment_custom_library(token: str, workspace_id: str, environment_id: str, library_name: str) -> dict
 
     _upload_fabric_environment_custom_library(token: str, workspace_id: str, environment_id: str, file_path: str) -> dict
         Uploads a wheel file as a custom library to a Fabric environment.
 
-    _delete_fabric_environment_published_custom_libraries(token: str, workspace_id: str, environment_id: str) -> None
-        Deletes all published custom libraries from a Fabric environment.
+    _delete_fabric_environment_published_custom_libraries(token: str, workspace_id: str, environment_id: str, package_name: str) -> None
+        Deletes the staged wheel files of a package from a Fabric environment.
 
     _cancel_fabric_environment_publish(token: str, workspace_id: str, environment_id: str) -> None
 
-    _publish_fabric_environment(token: str, workspace_id: str, environment_id: str) -> None
+    _publish_fabric_environment(token: str, workspace_id: str, environment_id: str) -> int
+
+    _is_fabric_environment_published(environment_id: str, state: str, allow_cancelled: bool = False) -> bool
 
-    _is_fabric_environment_published(token: str, workspace_id: str, environment_id: str, allow_cancelled: bool = False) -> bool
+    _wait_until_fabric_environment_publish_finished(token: str, workspace_id: str, environment_id: str, allow_cancelled: bool = False, timeout_in_minutes: int = 40, initial_poll_interval: int = 2, max_poll_interval: int = 30, first_poll_delay: float = 0) -> bool
 
-    _wait_until_fabric_environment_publish_finished(token: str, workspace_id: str, environment_id: str, allow_cancelled: bool = False, timeout_in_minutes: int = 40) -> bool
+    run_wheel_deployment_to_fabric(token: str, workspace_id: str, environment_id: str, file_path: str, skip_if_published: bool = False) -> None
 
-    run_wheel_deployment_to_fabric(token: str, workspace_id: str, environment_id: str, file_path: str) -> None
+    run_wheel_deployment_to_fabric_environments(token: str, workspace_id: str, environment_ids: list[str], file_path: str, skip_if_published: bool = False) -> None
+        Deploys a wheel file to several Fabric environments concurrently.
 
 Example:
     Set the following environment variables before running the script:
         FABRIC_CLIENT_ID, FABRIC_CLIENT_SECRET, FABRIC_TENANT_ID,
         FABRIC_WORKSPACE_ID, FABRIC_ENVIRONMENT_ID, FABRIC_FILE_PATH
 
-    Then execute the script to deploy the wheel file to the Fabric environment.
+    FABRIC_ENVIRONMENT_ID may contain a comma-separated list of environment IDs to deploy to in parallel.
+    Set FABRIC_SKIP_IF_PUBLISHED=true to skip environments that already have the same wheel file published.
+
+    Then execute the script to deploy the wheel file to the Fabric environment. The log level can be set with the
+    LOG_LEVEL environment variable (defaults to INFO).
 
     Exception: If any step in the deployment process fails.
     TimeoutError: If publishing the environment exceeds the specified timeout.
     ValueError: If required environment variables are not set.
 """
+import contextlib
+import functools
+import logging
 import os
+import random
 import time
-import urllib.parse
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from pathlib import Path
 
 import requests
+import urllib3
 from azure.identity import ClientSecretCredential
+from requests.adapters import HTTPAdapter
+from requests.structures import CaseInsensitiveDict
+from requests_toolbelt.multipart.encoder import MultipartEncoder
+
+try:
+    # orjson parses the polled JSON responses considerably faster, but is optional
+    from orjson import loads as _json_loads
+except ImportError:
+    from json import loads as _json_loads
+
+logger = logging.getLogger(__name__)
+
+_FABRIC_API_BASE_URL = "https://api.fabric.microsoft.com/v1"
+
+# Request bodies are sent in blocks of this size, so large wheels are streamed with few read and send calls
+_REQUEST_BODY_BLOCK_SIZE = 1 << 20
+
+# Only urllib3 2 accepts `blocksize` as a pool option, older versions reject it when creating a connection pool
+_SUPPORTS_POOL_BLOCKSIZE = int(urllib3.__version__.split(".")[0]) >= 2
+
+
+class _FabricHTTPAdapter(HTTPAdapter):
+    """
+    HTTP adapter whose connections send request bodies in 1 MiB blocks instead of urllib3's 16 KiB default.
+
+    On urllib3 1.x, which has no `blocksize` pool option, it behaves like a plain HTTPAdapter.
+    """
+
+    def init_poolmanager(self, connections: int, maxsize: int, block: bool = False, **pool_kwargs) -> None:
+        """Initializes the pool manager with the larger request body block size, if urllib3 supports it."""
+        if _SUPPORTS_POOL_BLOCKSIZE:
+            pool_kwargs.setdefault("blocksize", _REQUEST_BODY_BLOCK_SIZE)
+        super().init_poolmanager(connections, maxsize, block, **pool_kwargs)
+
+
+# Shared session so consecutive Fabric API calls reuse the pooled TCP/TLS connection
+_SESSION = requests.Session()
+_SESSION.mount("https://", _FabricHTTPAdapter(pool_connections=4, pool_maxsize=8))
+_SESSION.headers.update({"Content-Type": "application/json"})
+
+# (connect, read) timeouts in seconds, so a stalled connection fails and gets retried instead of hanging the agent.
+# Uploads get a longer read timeout, as the response only arrives once the whole wheel has been received.
+_REQUEST_TIMEOUT = (5, 60)
+_UPLOAD_REQUEST_TIMEOUT = (5, 600)
+
+# Status codes worth retrying (throttling and transient server errors); any other failure is raised immediately
+_RETRYABLE_STATUS_CODES = {429, 500, 502, 503, 504}
+
+# Seconds to wait after starting a publish before its state is first checked, when the API gives no Retry-After hint
+_DEFAULT_FIRST_POLL_DELAY = 2
+
+# Publish states in which no publish is running, so there is nothing to cancel before deploying
+_FINISHED_PUBLISH_STATES = {"Success", "Cancelled", "Failed"}
+
+# While the publish state does not change, log a progress line at most this often
+_POLL_LOG_INTERVAL_IN_SECONDS = 300
 
 
 def _get_fabric_api_token(client_id: str, client_secret: str, tenant_id: str) -> str:
@@ -74,69 +150,181 @@ def _get_fabric_api_token(client_id: str, client_secret: str, tenant_id: str) ->
     return token.token
 
 
-def _fabric_api_request(request_type: str, token: str, request_url: str, files: dict | None = None, headers: dict | None = None, max_retries: int = 3) -> str:
+def _get_retry_delay(attempt: int, response: requests.Response | None = None, base_delay: float = 1.0, max_delay: float = 30.0, jitter: float = 0.5) -> float:
+    """
+    Calculates how long to wait before retrying a failed Fabric API request.
+
+    Uses exponential backoff with random jitter, and never waits less than the `Retry-After` header asks for.
+
+    Args:
+        attempt (int): The number of the attempt that just failed, starting at 1.
+        response (requests.Response | None, optional): The failed response, if the server answered. Defaults to None.
+        base_delay (float, optional): Delay in seconds after the first failed attempt. Defaults to 1.0.
+        max_delay (float, optional): Upper bound in seconds for the backoff before jitter. Defaults to 30.0.
+        jitter (float, optional): Maximum fraction of the delay added at random. Defaults to 0.5.
+
+    Returns:
+        float: The number of seconds to wait before the next attempt.
+    """
+    delay = min(max_delay, base_delay * (2 ** (attempt - 1))) * (1 + random.uniform(0, jitter))
+    if response is not None:
+        # A Retry-After given as an HTTP date is ignored in favour of the backoff delay
+        with contextlib.suppress(ValueError):
+            delay = max(delay, float(response.headers.get("Retry-After", 0)))
+    return delay
+
+
+@functools.cache
+def _get_fabric_environment_url(workspace_id: str, environment_id: str) -> str:
+    """
+    Builds the Fabric API URL of an environment, which the environment endpoints extend with a relative path.
+
+    The URL is built once per environment and reused afterwards, e.g. by every poll of the publish state.
+
+    Args:
+        workspace_id (str): The ID of the workspace containing the environment.
+        environment_id (str): The ID of the environment.
+
+    Returns:
+        str: The absolute URL of the environment resource.
+    """
+    return f"{_FABRIC_API_BASE_URL}/workspaces/{workspace_id}/environments/{environment_id}"
+
+
+def _sleep_before_retry(delay: float, request_url: str, deadline: float | None = None) -> None:
+    """
+    Sleeps before the next attempt of a Fabric API request, unless that would overrun the deadline.
+
+    Args:
+        delay (float): The number of seconds to sleep.
+        request_url (str): The URL of the request being retried, used in the error message.
+        deadline (float | None, optional): Absolute `time.monotonic()` cutoff for the request. Defaults to None.
+
+    Raises:
+        TimeoutError: If sleeping would pass the deadline.
+    """
+    if deadline is not None and time.monotonic() + delay > deadline:
+        msg = f"Deadline reached before Fabric API request could be retried. URL: {request_url}"
+        raise TimeoutError(msg)
+    time.sleep(delay)
+
+
+def _fabric_api_request(request_type: str, token: str, request_url: str, files: dict | None = None, headers: dict | None = None, params: dict | None = None, max_retries: int = 3, return_headers: bool = False, deadline: float | None = None, etag: str | None = None) -> dict | tuple[dict | None, CaseInsensitiveDict] | None:
     """
     Sends an HTTP request to the Microsoft Fabric API with optional retries.
 
+    Every request has a connect and read timeout. Throttled (429) and transient server error responses, as well as
+    connection errors and timeouts, are retried with exponential backoff. Any other response that is not 200, 202 or
+    (for conditional requests) 304 fails immediately.
+
     Args:
         request_type (str): The HTTP method to use (e.g., 'GET', 'POST').
         token (str): Bearer token for API authentication.
-        request_url (str): The endpoint path or URL to send the request to.
-        files (dict | None, optional): Files to include in the request (for multipart/form-data). Defaults to None.
-        headers (dict | None, optional): Additional headers to include in the request. Defaults to None.
+        request_url (str): The absolute URL to send the request to.
+        files (dict | None, optional): Files to stream in the request (for multipart/form-data), as a mapping of
+            field name to a `(file name, file object, content type)` tuple. Defaults to None.
+        headers (dict | None, optional): Additional headers to include in the request, merged over the session
+            defaults. Defaults to None.
+        params (dict | None, optional): Query string parameters, encoded by requests. Defaults to None.
         max_retries (int, optional): Maximum number of retry attempts on failure. Defaults to 3.
+        return_headers (bool, optional): Whether to also return the response headers. Defaults to False.
+        deadline (float | None, optional): Absolute `time.monotonic()` cutoff after which no more retries are
+            attempted. Defaults to None.
+        etag (str | None, optional): ETag of a previously received response, sent as `If-None-Match` so the API can
+            answer with 304 Not Modified instead of the full body. Defaults to None.
 
     Returns:
-        str: The JSON response from the API as a string.
+        dict | tuple[dict | None, CaseInsensitiveDict] | None: The decoded JSON response from the API, or a
+            `(json, headers)` tuple if `return_headers` is True. Accepted (202) responses without a body give an empty
+            dict, Not Modified (304) responses give None in place of the JSON.
 
     Raises:
-        Exception: If the request fails after the specified number of retries, or if the response status code is not 200.
+        Exception: If the request fails after the specified number of retries, or if the response status code is not
+            successful and not retryable.
+        TimeoutError: If the deadline would be passed before the next retry.
     """
-    if headers is None:
-        headers = {
-            "Content-Type": "application/json",
-        }
-    headers["Authorization"] = f"Bearer {token}"
+    request_headers = {"Authorization": f"Bearer {token}"}
+    if headers is not None:
+        request_headers.update(headers)
+    if etag is not None:
+        request_headers["If-None-Match"] = etag
+    timeout = _REQUEST_TIMEOUT if files is None else _UPLOAD_REQUEST_TIMEOUT
 
-    request_url = f"https://api.fabric.microsoft.com/v1/{request_url.lstrip('/')}"
     for attempt in range(1, max_retries + 1):
-
-        response = requests.request(
-            request_type,
-            request_url,
-            headers=headers,
-            files=files,
-        )
-        if response.status_code == 200:
-            return response.json()
+        data = None
+        if files is not None:
+            # Stream the multipart body straight from disk instead of buffering it in memory. The encoder consumes
+            # the file objects, so rewind them and build a fresh encoder for every attempt.
+            for field in files.values():
+                field[1].seek(0)
+            data = MultipartEncoder(fields=files)
+            request_headers["Content-Type"] = data.content_type
+
+        try:
+            response = _SESSION.request(
+                request_type,
+                request_url,
+                headers=request_headers,
+                params=params,
+                data=data,
+                timeout=timeout,
+            )
+        except (requests.ConnectionError, requests.Timeout) as e:
+            if attempt >= max_retries:
+                msg = f"Fabric API request failed after {max_retries} attempts: {e}. URL: {request_url}"
+                raise Exception(msg) from e
+            _sleep_before_retry(_get_retry_delay(attempt), request_url, deadline)
+            continue
+
+        if etag is not None and response.status_code == 304:
+            return (None, response.headers) if return_headers else None
+
+        if response.status_code in (200, 202):
+            response_json = _json_loads(response.content) if response.content else {}
+            return (response_json, response.headers) if return_headers else response_json
+
+        if response.status_code not in _RETRYABLE_STATUS_CODES:
+            msg = f"Fabric API request failed with status code {response.status_code}: {response.text}. URL: {request_url}"
+            raise Exception(msg)
 
         if attempt < max_retries:
-            time.sleep(3)
+            _sleep_before_retry(_get_retry_delay(attempt, response), request_url, deadline)
         else:
             msg = f"Fabric API request failed after {max_retries} attempts with status code {response.status_code}: {response.text}. URL: {request_url}"
             raise Exception(msg)
     return None
 
 
-def _get_fabric_environment_state(token: str, workspace_id: str, environment_id: str) -> str:
+def _get_fabric_environment_state(token: str, workspace_id: str, environment_id: str, deadline: float | None = None, etag: str | None = None, cached_state: str | None = None) -> tuple[str, str | None]:
     """
     Retrieves the state of a specific Fabric environment.
 
+    When the `etag` and `cached_state` of a previous call are passed, the request is made conditional and the cached
+    state is returned as-is if the API reports the environment as not modified.
+
     Args:
         token (str): The authentication token for the Fabric API.
         workspace_id (str): The ID of the workspace containing the environment.
         environment_id (str): The ID of the environment whose state is to be retrieved.
+        deadline (float | None, optional): Absolute `time.monotonic()` cutoff for retrying the request. Defaults to None.
+        etag (str | None, optional): The ETag returned by a previous call. Defaults to None.
+        cached_state (str | None, optional): The state returned by a previous call. Defaults to None.
 
     Returns:
-        str: The state of the specified Fabric environment.
+        tuple[str, str | None]: The state of the specified Fabric environment and the ETag of the response, if any.
 
     Raises:
         Exception: If the API response does not contain the expected keys.
     """
-    environment_details = _fabric_api_request(
-        "GET", token, f"workspaces/{workspace_id}/environments/{environment_id}")
+    if cached_state is None:
+        etag = None  # Without a cached state a 304 response could not be answered
+    environment_details, response_headers = _fabric_api_request(
+        "GET", token, _get_fabric_environment_url(workspace_id, environment_id), return_headers=True,
+        deadline=deadline, etag=etag)
+    if environment_details is None:
+        return cached_state, etag
     try:
-        return environment_details["properties"]["publishDetails"]["state"]
+        return environment_details["properties"]["publishDetails"]["state"], response_headers.get("ETag")
     except KeyError as e:
         msg = f"Incorrect API response {environment_details}"
         raise Exception(
@@ -156,7 +344,25 @@ def _get_fabric_environment_custom_libraries(token: str, workspace_id: str, envi
         dict: A dictionary containing information about the custom libraries in the specified environment.
     """
     try:
-        return _fabric_api_request("GET", token, f"workspaces/{workspace_id}/environments/{environment_id}/staging/libraries")
+        return _fabric_api_request("GET", token, f"{_get_fabric_environment_url(workspace_id, environment_id)}/staging/libraries")
+    except Exception:
+        return {"customLibraries": {"wheelFiles": []}}
+
+
+def _get_fabric_environment_published_custom_libraries(token: str, workspace_id: str, environment_id: str) -> dict:
+    """
+    Retrieves the custom libraries of the currently published version of a Fabric environment.
+
+    Args:
+        token (str): The authentication token to access the Fabric API.
+        workspace_id (str): The ID of the workspace containing the environment.
+        environment_id (str): The ID of the environment whose published libraries are to be retrieved.
+
+    Returns:
+        dict: A dictionary containing information about the published custom libraries in the specified environment.
+    """
+    try:
+        return _fabric_api_request("GET", token, f"{_get_fabric_environment_url(workspace_id, environment_id)}/libraries")
     except Exception:
         return {"customLibraries": {"wheelFiles": []}}
 
@@ -177,13 +383,13 @@ def _delete_fabric_environment_custom_library(token: str, workspace_id: str, env
     Raises:
         requests.HTTPError: If the API request fails.
     """
-    encoded_library_name = urllib.parse.quote(library_name)
     return _fabric_api_request("DELETE", token,
-                               f"workspaces/{workspace_id}/environments/{environment_id}/staging/libraries?libraryToDelete={encoded_library_name}"
+                               f"{_get_fabric_environment_url(workspace_id, environment_id)}/staging/libraries",
+                               params={"libraryToDelete": library_name}
                                )
 
 
-def _upload_fabric_environment_custom_library(token: str, workspace_id: str, environment_id: str, file_path: str) -> None:
+def _upload_fabric_environment_custom_library(token: str, workspace_id: str, environment_id: str, file_path: str) -> dict:
     """
     Uploads a custom library file to a specified Fabric environment.
 
@@ -194,19 +400,22 @@ def _upload_fabric_environment_custom_library(token: str, workspace_id: str, env
         file_path (str): The local file path of the library to upload.
 
     Returns:
-        None
+        dict: The response from the Fabric API after uploading the library.
 
     Raises:
         Any exceptions raised by the underlying _fabric_api_request function.
     """
     file = Path(file_path)
-    files = {'file': (Path(file_path).name, file.open('rb'))}
+    with file.open('rb', buffering=_REQUEST_BODY_BLOCK_SIZE) as file_handle:
+        if hasattr(os, "posix_fadvise"):
+            # The multipart encoder reads the wheel front to back, let the kernel read ahead aggressively
+            os.posix_fadvise(file_handle.fileno(), 0, 0, os.POSIX_FADV_SEQUENTIAL)
+        files = {'file': (file.name, file_handle, 'application/octet-stream')}
 
-    _fabric_api_request("POST", token,
-                        f"workspaces/{workspace_id}/environments/{environment_id}/staging/libraries",
-                        files=files,
-                        headers={}
-                        )
+        return _fabric_api_request("POST", token,
+                                   f"{_get_fabric_environment_url(workspace_id, environment_id)}/staging/libraries",
+                                   files=files,
+                                   )
 
 
 def _delete_fabric_environment_published_custom_libraries(token: str, workspace_id: str, environment_id: str, package_name: str) -> None:
@@ -214,13 +423,16 @@ def _delete_fabric_environment_published_custom_libraries(token: str, workspace_
         token, workspace_id, environment_id)
 
     if "customLibraries" in libraries and "wheelFiles" in libraries["customLibraries"]:
-        for library_name in libraries["customLibraries"]['wheelFiles']:
-            if library_name.startswith(package_name):
-                print(
-                    f"Deleting custom library {library_name} from environment {environment_id}")
-                # Delete the custom library
-            _delete_fabric_environment_custom_library(
-                token, workspace_id, environment_id, library_name)
+        # The libraries are independent resources, so delete them concurrently
+        with ThreadPoolExecutor(max_workers=8) as executor:
+            futures = []
+            for library_name in libraries["customLibraries"]['wheelFiles']:
+                if library_name.startswith(package_name):
+                    logger.info("Deleting custom library %s from environment %s", library_name, environment_id)
+                    futures.append(executor.submit(_delete_fabric_environment_custom_library,
+                                                   token, workspace_id, environment_id, library_name))
+            for future in as_completed(futures):
+                future.result()
 
 
 def _cancel_fabric_environment_publish(token: str, workspace_id: str, environment_id: str) -> None:
@@ -236,45 +448,53 @@ def _cancel_fabric_environment_publish(token: str, workspace_id: str, environmen
         requests.HTTPError: If the API request fails.
     """
     _fabric_api_request("POST", token,
-                        f"workspaces/{workspace_id}/environments/{environment_id}/staging/cancelPublish")
+                        f"{_get_fabric_environment_url(workspace_id, environment_id)}/staging/cancelPublish")
 
 
-def _publish_fabric_environment(token: str, workspace_id: str, environment_id: str) -> None:
+def _publish_fabric_environment(token: str, workspace_id: str, environment_id: str) -> int:
     """
     Publishes a Fabric environment to staging.
 
     This function sends a POST request to the Fabric API to publish the specified environment
-    within a given workspace. Upon successful publishing, a confirmation message is printed.
+    within a given workspace. Upon successful publishing, a confirmation message is logged.
+    If the API answers in the asynchronous operation style with a `Retry-After` header, that value is
+    returned so the first state check can be scheduled accordingly.
 
     Args:
         token (str): The authentication token for the Fabric API.
         workspace_id (str): The ID of the workspace containing the environment.
         environment_id (str): The ID of the environment to be published.
 
+    Returns:
+        int: The number of seconds to wait before checking the publish state for the first time.
+
     Raises:
         Any exceptions raised by the underlying _fabric_api_request function.
     """
-    _fabric_api_request("POST", token,
-                        f"workspaces/{workspace_id}/environments/{environment_id}/staging/publish"
-                        )
-    print(
-        f"Environment {environment_id} publish started successfully. Waiting for it to finish...")
+    _, response_headers = _fabric_api_request("POST", token,
+                                              f"{_get_fabric_environment_url(workspace_id, environment_id)}/staging/publish",
+                                              return_headers=True
+                                              )
+    logger.info("Environment %s publish started successfully. Waiting for it to finish...", environment_id)
+    try:
+        return max(1, int(response_headers.get("Retry-After", _DEFAULT_FIRST_POLL_DELAY)))
+    except ValueError:
+        return _DEFAULT_FIRST_POLL_DELAY
 
 
-def _is_fabric_environment_published(token: str, workspace_id: str, environment_id: str, allow_cancelled: bool = False) -> bool:
+def _is_fabric_environment_published(environment_id: str, state: str, allow_cancelled: bool = False) -> bool:
     """
     Checks if a Fabric environment has been published successfully.
 
-    This function retrieves the current state of the specified Fabric environment and determines
-    whether it has been published. If the environment is in a "Success" state, it returns True.
+    This function determines from the given publish state of a Fabric environment whether it has
+    been published. If the environment is in a "Success" state, it returns True.
     If the environment is in a "Failed" state, or in a "Cancelled" state (unless `allow_cancelled`
     is True), it raises an Exception. Otherwise, it returns False, indicating the environment
     is not yet published.
 
     Args:
-        token (str): The authentication token to access the Fabric API.
-        workspace_id (str): The ID of the workspace containing the environment.
-        environment_id (str): The ID of the environment to check.
+        environment_id (str): The ID of the environment to check, used in the error message.
+        state (str): The publish state of the environment, as returned by _get_fabric_environment_state.
         allow_cancelled (bool, optional): Whether to treat a "Cancelled" state as a non-error.
             Defaults to False.
 
@@ -284,7 +504,6 @@ def _is_fabric_environment_published(token: str, workspace_id: str, environment_
     Raises:
         Exception: If the environment state is "Failed" or "Cancelled" (unless `allow_cancelled` is True).
     """
-    state = _get_fabric_environment_state(token, workspace_id, environment_id)
     if state == "Success":
         return True
 
@@ -296,12 +515,14 @@ def _is_fabric_environment_published(token: str, workspace_id: str, environment_
     return False  # Else, the environment is not published yet
 
 
-def _wait_until_fabric_environment_publish_finished(token: str, workspace_id: str, environment_id: str, allow_cancelled: bool = False, timeout_in_minutes: int = 40) -> bool:
+def _wait_until_fabric_environment_publish_finished(token: str, workspace_id: str, environment_id: str, allow_cancelled: bool = False, timeout_in_minutes: int = 40, initial_poll_interval: int = 2, max_poll_interval: int = 30, first_poll_delay: float = 0) -> bool:
     """
     Waits until the specified Fabric environment is published or until a timeout is reached.
 
     This function repeatedly checks the publish status of a Fabric environment and waits until it is published,
     or until the specified timeout period elapses. Optionally, environments that are cancelled can be considered as published.
+    The poll interval starts short and doubles after every check, up to `max_poll_interval`. Progress is only logged
+    when the state changes (or every five minutes), followed by a single summary once the publish has finished.
 
     Args:
         token (str): Authentication token for accessing the Fabric environment.
@@ -309,33 +530,60 @@ def _wait_until_fabric_environment_publish_finished(token: str, workspace_id: st
         environment_id (str): The ID of the environment to check.
         allow_cancelled (bool, optional): If True, treat cancelled environments as published. Defaults to False.
         timeout_in_minutes (int, optional): Maximum time to wait for the environment to be published, in minutes. Defaults to 40.
+        initial_poll_interval (int, optional): Seconds to wait after the first check. Defaults to 2.
+        max_poll_interval (int, optional): Maximum number of seconds to wait between checks. Defaults to 30.
+        first_poll_delay (float, optional): Seconds to wait before the first check, e.g. the delay returned by
+            _publish_fabric_environment so the state from before the publish is not read. Defaults to 0.
 
     Returns:
         bool: True if the environment is published (or cancelled if allowed) before the timeout.
 
     Raises:
-        TimeoutError: If the environment is not published within the specified timeout period.
+        TimeoutError: If the environment is not published within the specified timeout period, including when
+            retrying a state request would exceed it.
     """
-    start_time = time.time()
+    # A single deadline bounds both the polling and the retries of the individual state requests
+    start_time = time.monotonic()
+    deadline = start_time + timeout_in_minutes * 60
+    poll_interval = initial_poll_interval
+    poll_count = 0
+    state = None
+    etag = None
+    last_state = None
+    last_log_time = start_time
+    if first_poll_delay > 0:
+        time.sleep(min(first_poll_delay, timeout_in_minutes * 60))
     while True:
-        if _is_fabric_environment_published(token, workspace_id, environment_id, allow_cancelled):
-            print(f"Environment {environment_id} is published successfully.")
+        state, etag = _get_fabric_environment_state(token, workspace_id, environment_id, deadline, etag, state)
+        poll_count += 1
+        if _is_fabric_environment_published(environment_id, state, allow_cancelled):
+            logger.info("Environment %s publish finished with state %s after %d seconds, %d polls.",
+                        environment_id, state, time.monotonic() - start_time, poll_count)
             return True
-        if time.time() - start_time > timeout_in_minutes * 60:
+        now = time.monotonic()
+        remaining_time = deadline - now
+        if remaining_time <= 0:
             msg = f"Timeout reached while waiting for environment {environment_id} to be published"
             raise TimeoutError(
                 msg
             )
-        print("Waiting for environment to be published, checking again in 30 seconds...")
-        time.sleep(30)  # Wait 30 seconds before checking again
+        if state != last_state or now - last_log_time > _POLL_LOG_INTERVAL_IN_SECONDS:
+            logger.info("Environment %s is in state %s, waiting for it to be published (%d seconds elapsed)...",
+                        environment_id, state, now - start_time)
+            last_state = state
+            last_log_time = now
+        time.sleep(min(poll_interval, remaining_time))
+        # Poll quickly at first, since small publishes often finish within a minute, then back off
+        poll_interval = min(poll_interval * 2, max_poll_interval)
 
 
-def run_wheel_deployment_to_fabric(token: str, workspace_id: str, environment_id: str, file_path: str) -> None:
+def run_wheel_deployment_to_fabric(token: str, workspace_id: str, environment_id: str, file_path: str, skip_if_published: bool = False) -> None:
     """
     Deploys a wheel file to a specified Fabric environment.
 
     This function manages the deployment process of a Python wheel file to a Fabric environment.
-    It ensures the environment is in the correct state, cancels any ongoing publish operations if necessary,
+    It ensures the environment is in the correct state, cancels any ongoing publish operations if necessary
+    (environments whose last publish already finished, failed or was cancelled are left as they are),
     deletes existing custom libraries, uploads the new wheel file, and publishes the environment.
 
     Args:
@@ -343,50 +591,100 @@ def run_wheel_deployment_to_fabric(token: str, workspace_id: str, environment_id
         workspace_id (str): The ID of the workspace containing the environment.
         environment_id (str): The ID of the Fabric environment to deploy to.
         file_path (str): The local file path to the wheel file to be deployed.
+        skip_if_published (bool, optional): If True, skip the deployment when the environment is published and already
+            contains a wheel with the same file name (and therefore the same version). Defaults to False.
 
     Raises:
         Exception: If any error occurs during the deployment process.
     """
     try:
         # First, check if the environment is in published state
-        if _get_fabric_environment_state(token, workspace_id, environment_id) != "Success":
-            print("Cancelling earlier publish....")
+        state, _ = _get_fabric_environment_state(token, workspace_id, environment_id)
+        file_name = Path(file_path).name
+        if skip_if_published and state == "Success":
+            published_libraries = _get_fabric_environment_published_custom_libraries(
+                token, workspace_id, environment_id)
+            if file_name in published_libraries.get("customLibraries", {}).get("wheelFiles", []):
+                logger.info("Environment %s already has %s published, skipping deployment.", environment_id, file_name)
+                return
+
+        if state == "Cancelling":
+            # An earlier cancel is still in progress, only wait for it to finish
+            _wait_until_fabric_environment_publish_finished(
+                token, workspace_id, environment_id, allow_cancelled=True)
+        elif state not in _FINISHED_PUBLISH_STATES:
+            logger.info("Cancelling earlier publish of environment %s....", environment_id)
             _cancel_fabric_environment_publish(
                 token, workspace_id, environment_id)
             _wait_until_fabric_environment_publish_finished(
                 token, workspace_id, environment_id, allow_cancelled=True)
 
         # We need to delete the custom libraries already in the environment
-        package_name = Path(file_path).name.split('-')[0]
+        package_name = file_name.split('-')[0]
         _delete_fabric_environment_published_custom_libraries(
             token, workspace_id, environment_id, package_name)
         _upload_fabric_environment_custom_library(
             token, workspace_id, environment_id, file_path)
 
-        _publish_fabric_environment(token, workspace_id, environment_id)
+        first_poll_delay = _publish_fabric_environment(token, workspace_id, environment_id)
 
         _wait_until_fabric_environment_publish_finished(
-            token, workspace_id, environment_id)
+            token, workspace_id, environment_id, first_poll_delay=first_poll_delay)
 
-        print(
-            f"Deployment of {file_path} to environment {environment_id} completed successfully.")
+        logger.info("Deployment of %s to environment %s completed successfully.", file_path, environment_id)
     except Exception as e:
-        print(f"An error occurred during deployment: {e}")
+        logger.error("An error occurred during deployment to environment %s: %s", environment_id, e)
         raise e
 
 
+def run_wheel_deployment_to_fabric_environments(token: str, workspace_id: str, environment_ids: list[str], file_path: str, skip_if_published: bool = False) -> None:
+    """
+    Deploys a wheel file to multiple Fabric environments concurrently.
+
+    Each environment is deployed in its own worker thread, so the long publish waits of the individual
+    environments overlap instead of running one after another.
+
+    Args:
+        token (str): The authentication token for accessing the Fabric API.
+        workspace_id (str): The ID of the workspace containing the environments.
+        environment_ids (list[str]): The IDs of the Fabric environments to deploy to.
+        file_path (str): The local file path to the wheel file to be deployed.
+        skip_if_published (bool, optional): If True, skip environments that already have this wheel published.
+            Defaults to False.
+
+    Raises:
+        Exception: The first error raised by any of the environment deployments.
+    """
+    with ThreadPoolExecutor(max_workers=max(1, len(environment_ids))) as executor:
+        futures = [
+            executor.submit(run_wheel_deployment_to_fabric, token, workspace_id, environment_id, file_path,
+                            skip_if_published)
+            for environment_id in environment_ids
+        ]
+        for future in as_completed(futures):
+            future.result()
+
+
 if __name__ == "__main__":
+    logging.basicConfig(level=os.getenv("LOG_LEVEL", "INFO"), format="%(asctime)s %(levelname)s %(message)s")
+
     CLIENT_ID = os.getenv("FABRIC_CLIENT_ID")
     CLIENT_SECRET = os.getenv("FABRIC_CLIENT_SECRET")
     TENANT_ID = os.getenv("FABRIC_TENANT_ID")
     WORKSPACE_ID = os.getenv("FABRIC_WORKSPACE_ID")
     ENVIRONMENT_ID = os.getenv("FABRIC_ENVIRONMENT_ID")
     FILE_PATH = os.getenv("FABRIC_FILE_PATH")
+    SKIP_IF_PUBLISHED = os.getenv("FABRIC_SKIP_IF_PUBLISHED", "false").lower() == "true"
 
     if not all([CLIENT_ID, CLIENT_SECRET, TENANT_ID, WORKSPACE_ID, ENVIRONMENT_ID, FILE_PATH]):
         error_message = "One or more environment variables are not set."
         raise ValueError(error_message)
 
     token = _get_fabric_api_token(CLIENT_ID, CLIENT_SECRET, TENANT_ID)
-    run_wheel_deployment_to_fabric(
-        token, WORKSPACE_ID, ENVIRONMENT_ID, FILE_PATH)
+    environment_ids = [environment_id.strip() for environment_id in ENVIRONMENT_ID.split(",") if environment_id.strip()]
+    if len(environment_ids) == 1:
+        run_wheel_deployment_to_fabric(
+            token, WORKSPACE_ID, environment_ids[0], FILE_PATH, SKIP_IF_PUBLISHED)
+    else:
+        run_wheel_deployment_to_fabric_environments(
+            token, WORKSPACE_ID, environment_ids, FILE_PATH, SKIP_IF_PUBLISHED)